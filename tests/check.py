@@ -3,9 +3,66 @@
 import re
 import os
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from lxml import etree
 
 
+# Strips the index from `type-name-index.svg`.
+TAG_NAME_RE = re.compile(r'-[0-9]+\.svg$')
+
+NODE_IDS_IGNORE_FILES = frozenset([
+    'e-svg-031.svg',  # because of ENTITY
+    'e-svg-032.svg',  # because of ENTITY
+    'e-use-024.svg',  # intended duplicate
+])
+
+NODE_IDS_IGNORE_TAGS = frozenset([
+    'title',
+    'desc',
+    'stop',
+    'feBlend',
+    'feColorMatrix',
+    'feComponentTransfer',
+    'feComposite',
+    'feConvolveMatrix',
+    'feDiffuseLighting',
+    'feDistantLight',
+    'feFlood',
+    'feFuncA',
+    'feFuncB',
+    'feFuncG',
+    'feFuncR',
+    'feGaussianBlur',
+    'feImage',
+    'feMerge',
+    'feMergeNode',
+    'feMorphology',
+    'feOffset',
+    'fePointLight',
+    'feSpecularLighting',
+    'feSpotLight',
+    'feTile',
+    'feTurbulence',
+])
+
+LINE_WIDTH_ALLOW = frozenset([
+    'e-svg-004.svg',
+    'e-svg-005.svg',
+    'e-svg-007.svg',
+    'e-svg-031.svg',
+    'e-svg-032.svg',
+    'a-fill-028.svg',
+    'e-tspan-010.svg',
+])
+
+XLINK_NS = 'http://www.w3.org/1999/xlink'
+
+XLINK_NS_ALLOW = frozenset([
+    'e-svg-003.svg',
+    'e-svg-032.svg',
+])
+
+
 def split_qname(name):
     if name[0] == '{':
         return name[1:].split('}')
@@ -24,173 +81,119 @@ def check_untracked_files(dir):
     raise ValueError('not all tests are added to the git')
 
 
-def check_title():
+def list_files():
+    return sorted(e.name for e in os.scandir('svg/') if e.name.endswith('.svg'))
+
+
+def check_title(titles):
     """
     Checks that element/attribute tests has unique titles and shorter than 60 symbols
     """
 
-    files = sorted(os.listdir('svg/'))
-    if '.directory' in files:
-        files.remove('.directory')
-
-    titles = {}
-    for file in files:
-        tag_name = re.sub('-[0-9]+\.svg', '', file)
-
-        tree = etree.parse('svg/' + file)
-        title = list(tree.getroot())[0].text
+    seen = {}
+    for file, title in titles:
+        tag_name = TAG_NAME_RE.sub('', file)
 
         if len(title) > 60:
             raise ValueError('{} has title longer than 60 symbols'.format(file))
 
-        if title in titles:
-            if titles[title][0] == tag_name:
-                raise ValueError('{} and {} have the same title'.format(titles[title][1], file))
+        if title in seen:
+            if seen[title][0] == tag_name:
+                raise ValueError('{} and {} have the same title'.format(seen[title][1], file))
 
-        titles[title] = (tag_name, file)
+        seen[title] = (tag_name, file)
 
 
-def check_node_ids():
+def check_node_ids(file, tree):
     """
     Checks that all elements has an unique ID attribute.
     """
 
-    files = sorted(os.listdir('svg/'))
-    if '.directory' in files:
-        files.remove('.directory')
-
-    ignore_files = [
-        'e-svg-031.svg',  # because of ENTITY
-        'e-svg-032.svg',  # because of ENTITY
-        'e-use-024.svg',  # intended duplicate
-    ]
-
-    ignore_tags = [
-        'title',
-        'desc',
-        'stop',
-        'feBlend',
-        'feColorMatrix',
-        'feComponentTransfer',
-        'feComposite',
-        'feConvolveMatrix',
-        'feDiffuseLighting',
-        'feDistantLight',
-        'feFlood',
-        'feFuncA',
-        'feFuncB',
-        'feFuncG',
-        'feFuncR',
-        'feGaussianBlur',
-        'feImage',
-        'feMerge',
-        'feMergeNode',
-        'feMorphology',
-        'feOffset',
-        'fePointLight',
-        'feSpecularLighting',
-        'feSpotLight',
-        'feTile',
-        'feTurbulence',
-    ]
-
-    for file in ignore_files:
-        files.remove(file)
-
-    for file in files:
-        tree = etree.parse('svg/' + file)
-        ids = set()
+    if file in NODE_IDS_IGNORE_FILES:
+        return
 
-        for node in tree.getroot().iter():
-            if node.tag is etree.Comment:
-                continue
+    ids = set()
+
+    for node in tree.getroot().iter():
+        if node.tag is etree.Comment:
+            continue
+
+        # extract tag name without namespace
+        _, tag = split_qname(node.tag)
+
+        if tag not in NODE_IDS_IGNORE_TAGS:
+            node_id = node.get('id')
+            # ID must be set
+            if not node_id:
+                raise ValueError('\'{}\' element in {} has no ID'
+                                 .format(tag, file))
+            else:
+                # Check that ID is unique
+                if node_id in ids:
+                    raise ValueError('\'{}\' ID already exist in {}'
+                                     .format(node_id, file))
+                else:
+                    ids.add(node_id)
 
-            # extract tag name without namespace
-            _, tag = split_qname(node.tag)
 
-            if tag not in ignore_tags:
-                node_id = node.get('id')
-                # ID must be set
-                if not node_id:
-                    raise ValueError('\'{}\' element in {} has no ID'
-                                     .format(tag, file))
-                else:
-                    # Check that ID is unique
-                    if node_id in ids:
-                        raise ValueError('\'{}\' ID already exist in {}'
-                                         .format(node_id, file))
-                    else:
-                        ids.add(node_id)
-
-
-def check_line_width():
-    allow = [
-        'e-svg-004.svg',
-        'e-svg-005.svg',
-        'e-svg-007.svg',
-        'e-svg-031.svg',
-        'e-svg-032.svg',
-        'a-fill-028.svg',
-        'e-tspan-010.svg',
-    ]
-
-    files = sorted(os.listdir('svg/'))
-    if '.directory' in files:
-        files.remove('.directory')
-
-    for file in allow:
-        files.remove(file)
-
-    for file in files:
-        with open('svg/' + file, 'r') as f:
-            for i, line in enumerate(f.read().splitlines()):
-                if len(line) > 100:
-                    raise ValueError('Line {} in {} is longer than 100 characters'.format(i, file))
-
-
-def check_for_unused_xlink_ns():
+def check_line_width(file):
+    if file in LINE_WIDTH_ALLOW:
+        return
+
+    with open('svg/' + file, 'r') as f:
+        for i, line in enumerate(f):
+            if len(line.rstrip('\r\n')) > 100:
+                raise ValueError('Line {} in {} is longer than 100 characters'.format(i, file))
+
+
+def check_for_unused_xlink_ns(file, tree):
     # In case when 'xlink:href' is present, but namespace is not set
     # the 'lxml' will raise an error.
 
-    allow = [
-        'e-svg-003.svg',
-        'e-svg-032.svg',
-    ]
+    if file in XLINK_NS_ALLOW:
+        return
+
+    # Let libxml2 stop at the first element with 'xlink:href'.
+    has_href = tree.getroot().xpath('boolean(descendant-or-self::*[@xlink:href])',
+                                    namespaces={'xlink': XLINK_NS})
 
-    files = sorted(os.listdir('svg/'))
-    if '.directory' in files:
-        files.remove('.directory')
+    if not has_href and 'xlink' in tree.getroot().nsmap:
+        raise ValueError('{} has an unneeded xlink namespace'.format(file))
 
-    for file in allow:
-        files.remove(file)
 
-    for file in files:
+def check_file(file):
+    """
+    Runs all per-file checks and returns the file title.
+    """
+
+    # lxml errors cannot be sent back from a worker process.
+    try:
         tree = etree.parse('svg/' + file)
+    except etree.ParseError as e:
+        raise ValueError(str(e))
 
-        has_href = False
-        for node in tree.getroot().iter():
-            if '{http://www.w3.org/1999/xlink}href' in node.attrib:
-                has_href = True
-                break
+    check_node_ids(file, tree)
+    check_line_width(file)
+    check_for_unused_xlink_ns(file, tree)
 
-        if not has_href and 'xlink' in tree.getroot().nsmap:
-            raise ValueError('{} has an unneeded xlink namespace'.format(file))
+    return list(tree.getroot())[0].text
 
 
 def main():
-    check_title()
-    check_node_ids()
+    files = list_files()
+
+    # Files are independent, so check them in parallel
+    # and compare titles afterwards.
+    with ProcessPoolExecutor() as executor:
+        titles = list(executor.map(check_file, files, chunksize=32))
+
+    check_title(zip(files, titles))
     check_untracked_files('svg')
-    check_line_width()
-    check_for_unused_xlink_ns()
 
 
 if __name__ == '__main__':
     try:
         main()
-    except etree.ParseError as e:
-        print('Error: {}.'.format(e))
-        exit(1)
     except ValueError as e:
         print('Error: {}.'.format(e))
         exit(1)
@@ -29,6 +29,10 @@ pub fn render(name: &str) -> usize {
 
     let fit_to = usvg::FitTo::Width(IMAGE_SIZE);
     let size = fit_to.fit_to(tree.svg_node().size.to_screen_size()).unwrap();
+
+    // Load the reference first, so a size mismatch fails before rendering.
+    let expected_data = load_png(&png_path, size);
+
     let mut pixmap = tiny_skia::Pixmap::new(size.width(), size.height()).unwrap();
     resvg::render(&tree, fit_to, pixmap.as_mut()).unwrap();
 
@@ -37,7 +41,6 @@ pub fn render(name: &str) -> usize {
     let mut rgba = pixmap.take();
     svgfilters::demultiply_alpha(rgba.as_mut_slice().as_rgba_mut());
 
-    let expected_data = load_png(&png_path);
     assert_eq!(expected_data.len(), rgba.len());
 
     let mut pixels_d = 0;
@@ -55,11 +58,14 @@ pub fn render(name: &str) -> usize {
     pixels_d
 }
 
-fn load_png(path: &str) -> Vec<u8> {
+fn load_png(path: &str, size: usvg::ScreenSize) -> Vec<u8> {
     let data = std::fs::read(path).unwrap();
     let decoder = png::Decoder::new(data.as_slice());
     let (info, mut reader) = decoder.read_info().unwrap();
 
+    // Check the header before decoding the image data.
+    assert_eq!((info.width, info.height), (size.width(), size.height()));
+
     let mut img_data = vec![0; info.buffer_size()];
     reader.next_frame(&mut img_data).unwrap();
 